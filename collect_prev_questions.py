@@ -16,18 +16,28 @@ Usage:
 """
 
 import argparse
-import json
+import io
 import sys
+from itertools import chain
 from pathlib import Path
 
 # parser.py must be importable — the yml copies it to the same directory
 try:
-    from parser import parse_file
+    from parser import encode_questions, list_txt_files, parallel_map, parse_file, total_size
 except ImportError:
     # If not available, we just produce an empty file — never crash the build
     parse_file = None
 
 
+def _parse_or_error(path: str):
+    """parse_file, but a failure comes back as the exception so one bad file
+    cannot abort the whole batch."""
+    try:
+        return parse_file(path)
+    except Exception as e:
+        return e
+
+
 def collect(archive_dir: Path, day_range: str, output_file: Path) -> int:
     """
     Collect all questions from archive/day-{day_range}/*.txt
@@ -38,38 +48,38 @@ def collect(archive_dir: Path, day_range: str, output_file: Path) -> int:
 
     if not folder.exists():
         print(f"ℹ️  Archive folder not found: {folder} — writing empty array")
-        output_file.write_text("[]", encoding="utf-8")
+        output_file.write_bytes(b"[]")
         return 0
 
     if parse_file is None:
         print("⚠️  parser.py not available — writing empty array")
-        output_file.write_text("[]", encoding="utf-8")
+        output_file.write_bytes(b"[]")
         return 0
 
-    txt_files = sorted(folder.glob("*.txt"))
+    txt_files = list_txt_files(folder)
     if not txt_files:
         print(f"ℹ️  No .txt files in {folder} — writing empty array")
-        output_file.write_text("[]", encoding="utf-8")
+        output_file.write_bytes(b"[]")
         return 0
 
-    all_questions = []
-    for txt in txt_files:
-        try:
-            result = parse_file(str(txt))
-            if result.get("success") and result.get("questions"):
-                all_questions.extend(result["questions"])
-                print(f"  ✓ {txt.name}: {result['question_count']} questions")
-            else:
-                print(f"  ⚠ {txt.name}: parse failed or empty — skipped")
-        except Exception as e:
+    question_lists = []
+    log = io.StringIO()  # one stdout write instead of one per file
+    paths = [txt.path for txt in txt_files]
+    for txt, result in zip(txt_files, parallel_map(_parse_or_error, total_size(paths), paths)):
+        if isinstance(result, Exception):
             # Never let one bad file crash the whole step
-            print(f"  ⚠ {txt.name}: error ({e}) — skipped")
-
+            print(f"  ⚠ {txt.name}: error ({result}) — skipped", file=log)
+        elif result.get("success") and result.get("questions"):
+            question_lists.append(result["questions"])
+            print(f"  ✓ {txt.name}: {result['question_count']} questions", file=log)
+        else:
+            print(f"  ⚠ {txt.name}: parse failed or empty — skipped", file=log)
+    sys.stdout.write(log.getvalue())
+
+    # Flatten once at the end instead of growing one list file by file
+    all_questions = list(chain.from_iterable(question_lists))
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    output_file.write_text(
-        json.dumps(all_questions, ensure_ascii=False),
-        encoding="utf-8"
-    )
+    output_file.write_bytes(encode_questions(all_questions))
     print(f"✅ Wrote {len(all_questions)} previous questions to {output_file}")
     return len(all_questions)
 
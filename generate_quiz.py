@@ -10,12 +10,17 @@ All output is pure static HTML — zero JS routing.
 """
 
 import argparse
-import json
+import io
+import os
+import re
 import sys
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 try:
-    from parser import parse_file
+    from parser import detect_subject, encode_questions, list_txt_files, parallel_map, parse_file, total_size
 except ImportError:
     print("Error: parser.py must be in the same directory as generate_quiz.py", file=sys.stderr)
     sys.exit(1)
@@ -123,92 +128,208 @@ STREAM_PAGES = {
 }
 
 
+def _freeze(obj):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+# Card fragments depend only on static config — join them once at import
+for _page in STREAM_PAGES.values():
+    for _cluster in _page["clusters"]:
+        _cluster["_subjects_html"] = "".join(f'<span class="subject-tag">{s}</span>' for s in _cluster["subjects"])
+        _cluster["_for_html"] = "".join(f"<li>• {item}</li>" for item in _cluster["for"])
+del _page, _cluster
+
+# Config is static — freeze it so nothing can mutate it mid-run
+CLUSTERS = _freeze({name: [s.lower() for s in subjects] for name, subjects in CLUSTERS.items()})
+STREAM_PAGES = _freeze(STREAM_PAGES)
+
+# Template placeholders look like {{SUBJECT_NAME}}
+_PLACEHOLDER_RE = re.compile(rb"\{\{([A-Z_]+)\}\}")
+# Names not in generate_quiz's replacements that have already been warned about
+_warned_placeholders = set()
+# A normal run writes well under 1 MB — a thread pool (and importing it) costs
+# more than those writes take one after another
+_THREADED_WRITE_MIN_BYTES = 16 << 20
+
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def find_subject_file(subject: str, txt_files: list) -> Path | None:
+def index_subject_files(txt_files: list[os.DirEntry]) -> dict[str, os.DirEntry]:
+    """Map each subject to its first .txt file — one pass over the files, then
+    O(1) lookups per cluster. A file counts only for the subject detect_subject
+    gives it (the same one its individual quiz uses), and a file that spells the
+    subject out in full beats one that only matched a short alias like 'phy'."""
+    index, fallback = {}, {}
     for f in txt_files:
-        if subject.lower() in f.name.lower():
-            return f
-    return None
+        subject = detect_subject(f.name)
+        if subject is None:
+            continue
+        key = subject.lower()
+        (index if key in f.name.lower() else fallback).setdefault(key, f)
+    for key, f in fallback.items():
+        index.setdefault(key, f)
+    return index
+
+
+def parse_files(entries: list[os.DirEntry]) -> dict[os.DirEntry, dict]:
+    """Parse .txt files — in-process unless there is enough input to repay worker
+    processes (see parser.parallel_map). Returns {entry: result}."""
+    paths = [e.path for e in entries]
+    return dict(zip(entries, parallel_map(parse_file, total_size(paths), paths)))
+
+
+def concat_json_arrays(arrays: list[bytes]) -> bytes:
+    """Join already-encoded, non-empty JSON arrays into one array without re-encoding."""
+    return b"[" + b",".join(a[1:-1] for a in arrays) + b"]"
+
+
+def compile_template(data: bytes) -> tuple[list[bytes], list[str]]:
+    """Split the template once into literal chunks and the placeholder names between them.
+    literals[i] is followed by names[i]; there is always one more literal than name."""
+    parts = _PLACEHOLDER_RE.split(data)
+    return parts[0::2], [name.decode("ascii") for name in parts[1::2]]
+
+
+def _write_chunks(path: Path, chunks: list[bytes]) -> None:
+    # 1 MiB buffer coalesces the many small placeholder chunks into a few write() calls
+    with path.open("wb", buffering=1 << 20) as fh:
+        fh.writelines(chunks)
+
+
+def write_files(outputs: list[tuple[Path, list[bytes]]]) -> None:
+    """Write (path, [bytes, ...]) pairs — concurrently once there is enough to
+    write (file writes release the GIL). A path listed more than once is written
+    once with its last entry, as a sequential run would have left it; two
+    threads must never share a file."""
+    latest = {}
+    total = 0
+    for path, chunks in outputs:
+        if path in latest:
+            print(f"⚠️  {path.name} was generated more than once this run — keeping the last one",
+                  file=sys.stderr)
+        latest[path] = chunks
+        total += sum(map(len, chunks))
+    if total < _THREADED_WRITE_MIN_BYTES:
+        for path, chunks in latest.items():
+            _write_chunks(path, chunks)
+        return
+    from concurrent.futures import ThreadPoolExecutor  # only paid for on big runs
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(lambda item: _write_chunks(*item), latest.items()))
 
 
 # ── Quiz generation ───────────────────────────────────────────────────────────
 
-def generate_quiz(template_path, output_path, questions, subject_name, subjects_list,
-                  period, day_range, generated_date, validation_status, timer_minutes):
-    template = template_path.read_text(encoding="utf-8")
+def generate_quiz(template: tuple[list[bytes], list[str]], output_path: Path, questions_json: bytes,
+                  total_questions: int, subject_name: str, subjects_list: str, period: int,
+                  day_range: str, generated_date: str, validation_status: str,
+                  timer_minutes: int) -> tuple[Path, list[bytes]]:
+    """template comes from compile_template(); the already-encoded questions_json is
+    emitted as its own chunk, so the template is never rescanned per quiz."""
+    # Every placeholder the template may use, and only here. QUESTIONS_JSON is
+    # already UTF-8 bytes; the rest are str and encoded as they are emitted.
     replacements = {
-        "{{SUBJECT_NAME}}":      subject_name,
-        "{{PERIOD}}":            str(period),
-        "{{DAY_RANGE}}":         day_range,
-        "{{GENERATED_DATE}}":    generated_date,
-        "{{VALIDATION_STATUS}}": validation_status,
-        "{{SUBJECTS_LIST}}":     subjects_list,
-        "{{TOTAL_QUESTIONS}}":   str(len(questions)),
-        "{{TIMER_DURATION}}":    f"{timer_minutes}:00",
-        "{{TIMER_MINUTES}}":     str(timer_minutes),
-        "{{QUESTIONS_JSON}}":    json.dumps(questions, ensure_ascii=False),
+        "QUESTIONS_JSON":    questions_json,
+        "SUBJECT_NAME":      subject_name,
+        "PERIOD":            str(period),
+        "DAY_RANGE":         day_range,
+        "GENERATED_DATE":    generated_date,
+        "VALIDATION_STATUS": validation_status,
+        "SUBJECTS_LIST":     subjects_list,
+        "TOTAL_QUESTIONS":   str(total_questions),
+        "TIMER_DURATION":    f"{timer_minutes}:00",
+        "TIMER_MINUTES":     str(timer_minutes),
     }
-    result = template
-    for k, v in replacements.items():
-        result = result.replace(k, v)
-    output_path.write_text(result, encoding="utf-8")
-    print(f"✅ Generated: {output_path.name} ({len(questions)} questions)")
-
-
-def run_individual(args, txt_files, template_path, output_dir):
-    generated, skipped = [], []
-    for txt_file in txt_files:
-        result = parse_file(str(txt_file))
+    literals, names = template
+
+    chunks = [literals[0]]
+    for name, literal in zip(names, literals[1:]):
+        value = replacements.get(name)
+        if value is None:  # unknown placeholders are left as-is — warn once per run, not per quiz
+            if name not in _warned_placeholders:
+                _warned_placeholders.add(name)
+                print(f"Warning: unknown template placeholder left as-is: {{{{{name}}}}}", file=sys.stderr)
+            value = f"{{{{{name}}}}}"
+        chunks.append(value if isinstance(value, bytes) else value.encode("utf-8"))
+        chunks.append(literal)
+    return output_path, chunks
+
+
+def run_individual(args: argparse.Namespace, parsed: dict[os.DirEntry, dict], encoded: dict[os.DirEntry, bytes],
+                   template: tuple[list[bytes], list[str]], output_dir: Path) -> tuple[list[str], list[str]]:
+    generated, skipped, outputs = [], [], []
+    log = io.StringIO()  # one stdout write per run instead of one per file
+    for txt_file, result in parsed.items():
         if not result["success"] or result["question_count"] == 0:
-            print(f"⚠️  Skipping {txt_file.name}: {result['errors']}")
+            print(f"⚠️  Skipping {txt_file.name}: {result['errors']}", file=log)
             skipped.append(txt_file.name)
             continue
         subject = result["subject"]
         output_file = output_dir / f"quiz-{subject.lower()}.html"
-        generate_quiz(template_path, output_file, result["questions"], subject, subject,
-                      args.period, args.day_range, args.generated_date,
-                      args.validation_status, 15)
+        outputs.append(generate_quiz(template, output_file, encoded[txt_file],
+                                     result["question_count"], subject, subject,
+                                     args.period, args.day_range, args.generated_date,
+                                     args.validation_status, 15))
+        print(f"✅ Generated: {output_file.name} ({result['question_count']} questions)", file=log)
         generated.append(output_file.name)
+    write_files(outputs)
+    sys.stdout.write(log.getvalue())
     return generated, skipped
 
 
-def run_clusters(args, txt_files, template_path, output_dir):
-    generated, skipped = [], []
+def run_clusters(args: argparse.Namespace, subject_files: dict[str, os.DirEntry],
+                 parsed: dict[os.DirEntry, dict], encoded: dict[os.DirEntry, bytes],
+                 template: tuple[list[bytes], list[str]], output_dir: Path) -> tuple[list[str], list[str]]:
+    generated, skipped, outputs = [], [], []
+    log = io.StringIO()
     for cluster_name, required_subjects in CLUSTERS.items():
-        combined_questions, subjects_found = [], []
+        if subject_files.keys().isdisjoint(required_subjects):
+            print(f"⚠️  Skipping {cluster_name} — no files for {', '.join(required_subjects)}", file=log)
+            skipped.append(cluster_name)
+            continue
+        fragments, subjects_found, total = [], [], 0
         for subject in required_subjects:
-            match = find_subject_file(subject, txt_files)
+            match = subject_files.get(subject)
             if not match:
-                print(f"⚠️  Missing '{subject}' for {cluster_name}")
+                print(f"⚠️  Missing '{subject}' for {cluster_name}", file=log)
                 continue
-            result = parse_file(str(match))
+            result = parsed[match]
             if result["success"] and result["question_count"] > 0:
-                combined_questions.extend(result["questions"])
+                fragments.append(encoded[match])
+                total += result["question_count"]
                 subjects_found.append(subject.capitalize())
-        if not combined_questions:
-            print(f"⚠️  Skipping {cluster_name} — no valid questions found")
+        if not fragments:
+            print(f"⚠️  Skipping {cluster_name} — no valid questions found", file=log)
             skipped.append(cluster_name)
             continue
         output_file = output_dir / f"quiz-{cluster_name}.html"
-        generate_quiz(template_path, output_file, combined_questions,
-                      cluster_name.replace("-", " ").title(),
-                      ", ".join(subjects_found),
-                      args.period, args.day_range, args.generated_date,
-                      args.validation_status, 60)
+        outputs.append(generate_quiz(template, output_file, concat_json_arrays(fragments), total,
+                                     cluster_name.replace("-", " ").title(),
+                                     ", ".join(subjects_found),
+                                     args.period, args.day_range, args.generated_date,
+                                     args.validation_status, 60))
+        print(f"✅ Generated: {output_file.name} ({total} questions)", file=log)
         generated.append(output_file.name)
+    write_files(outputs)
+    sys.stdout.write(log.getvalue())
     return generated, skipped
 
 
 # ── Listing page generation ───────────────────────────────────────────────────
 
-def _cluster_card(cluster, available_files, badge_class, btn_class):
-    available = cluster["file"] in available_files
-    subjects_html = "".join(f'<span class="subject-tag">{s}</span>' for s in cluster["subjects"])
-    for_html = "".join(f"<li>• {item}</li>" for item in cluster["for"])
+# Cards depend only on static config + availability, and the same subject card
+# appears on several pages — build each distinct card once.
 
+@lru_cache(maxsize=None)
+def _cluster_card(name: str, code: str, file: str, subjects_html: str, for_html: str,
+                  available: bool, badge_class: str, btn_class: str) -> str:
     if available:
-        action = f'<a href="{cluster["file"]}" class="btn {btn_class} w-full mt-lg"><i class="fas fa-play"></i> Start Cluster Exam</a>'
+        action = f'<a href="{file}" class="btn {btn_class} w-full mt-lg"><i class="fas fa-play"></i> Start Cluster Exam</a>'
     else:
         action = '<button class="btn btn-disabled w-full mt-lg" disabled><i class="fas fa-hourglass-half"></i> Not Yet Available</button>'
 
@@ -216,8 +337,8 @@ def _cluster_card(cluster, available_files, badge_class, btn_class):
             <div class="card cluster-card">
                 <div class="card-body">
                     <div class="flex items-center justify-between mb-lg">
-                        <h3 class="text-xl font-semibold">{cluster["name"]}</h3>
-                        <span class="badge {badge_class} px-3 py-1 rounded-full text-sm font-semibold">{cluster["code"]}</span>
+                        <h3 class="text-xl font-semibold">{name}</h3>
+                        <span class="badge {badge_class} px-3 py-1 rounded-full text-sm font-semibold">{code}</span>
                     </div>
                     <div class="cluster-subjects">{subjects_html}</div>
                     <ul class="text-sm text-muted space-y-1 mt-lg">{for_html}</ul>
@@ -230,17 +351,17 @@ def _cluster_card(cluster, available_files, badge_class, btn_class):
             </div>"""
 
 
-def _subject_card(subject, available_files):
-    available = subject["file"] in available_files
+@lru_cache(maxsize=None)
+def _subject_card(emoji: str, name: str, file: str, available: bool) -> str:
     if available:
-        action = f'<a href="{subject["file"]}" class="btn btn-primary w-full btn-sm"><i class="fas fa-play"></i> Start</a>'
+        action = f'<a href="{file}" class="btn btn-primary w-full btn-sm"><i class="fas fa-play"></i> Start</a>'
     else:
         action = '<button class="btn btn-disabled w-full btn-sm" disabled><i class="fas fa-hourglass-half"></i> Soon</button>'
 
     return f"""
             <div class="card"><div class="card-body text-center">
-                <div class="text-5xl mb-md">{subject["emoji"]}</div>
-                <h3 class="text-lg font-semibold mb-sm">{subject["name"]}</h3>
+                <div class="text-5xl mb-md">{emoji}</div>
+                <h3 class="text-lg font-semibold mb-sm">{name}</h3>
                 <div class="flex justify-center gap-sm mb-lg text-sm text-muted">
                     <div class="flex items-center gap-xs"><i class="fas fa-list-ol"></i><span>35 Q</span></div>
                     <div class="flex items-center gap-xs"><i class="fas fa-clock"></i><span>15 min</span></div>
@@ -249,16 +370,8 @@ def _subject_card(subject, available_files):
             </div></div>"""
 
 
-def generate_listing_page(output_path, page_cfg, available_files, day_range):
-    title  = page_cfg["title"]
-    stream = page_cfg["stream"]
-    badge  = page_cfg["badge_class"]
-    btn    = page_cfg["btn_class"]
-
-    clusters_html  = "".join(_cluster_card(c, available_files, badge, btn) for c in page_cfg["clusters"])
-    subjects_html  = "".join(_subject_card(s, available_files) for s in page_cfg["individuals"])
-
-    html = f"""<!DOCTYPE html>
+# Fixed page skeleton — only the {slots} change between stream pages
+_LISTING_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -358,27 +471,52 @@ def generate_listing_page(output_path, page_cfg, available_files, day_range):
 </body>
 </html>"""
 
-    output_path.write_text(html, encoding="utf-8")
-    print(f"✅ Generated: {output_path.name}")
 
+def generate_listing_page(output_path: Path, page_cfg: Mapping, available_files: frozenset[str],
+                          day_range: str) -> tuple[Path, list[bytes]]:
+    title  = page_cfg["title"]
+    stream = page_cfg["stream"]
+    badge  = page_cfg["badge_class"]
+    btn    = page_cfg["btn_class"]
+
+    clusters_html  = "".join([
+        _cluster_card(c["name"], c["code"], c["file"], c["_subjects_html"], c["_for_html"],
+                      c["file"] in available_files, badge, btn)
+        for c in page_cfg["clusters"]
+    ])
+    subjects_html  = "".join([
+        _subject_card(s["emoji"], s["name"], s["file"], s["file"] in available_files)
+        for s in page_cfg["individuals"]
+    ])
+
+    html = _LISTING_TEMPLATE.format(
+        title=title, stream=stream, badge=badge, day_range=day_range,
+        clusters_html=clusters_html, subjects_html=subjects_html,
+    )
 
-def run_pages(args, txt_files, output_dir, generated_this_run=None):
+    return output_path, [html.encode("utf-8")]
+
+
+def run_pages(args: argparse.Namespace, txt_files: list[os.DirEntry], output_dir: Path,
+              generated_this_run: set[str] | None = None) -> list[str]:
     """Generate cluster listing pages with live/disabled links based on what was actually generated."""
     # Determine which quiz files exist (or were just generated this run)
-    available_files = generated_this_run if generated_this_run is not None else set()
+    available_files = frozenset(generated_this_run or ())
 
-    generated = []
+    generated, outputs = [], []
     for filename, page_cfg in STREAM_PAGES.items():
         output_path = output_dir / filename
-        generate_listing_page(output_path, page_cfg, available_files, args.day_range)
+        outputs.append(generate_listing_page(output_path, page_cfg, available_files, args.day_range))
         generated.append(filename)
 
+    write_files(outputs)
+    sys.stdout.write("".join(f"✅ Generated: {name}\n" for name in generated))
     return generated
 
 
 # ── CLI ───────────────────────────────────────────────────────────────────────
 
-def main():
+def main() -> None:
     arg_parser = argparse.ArgumentParser()
     arg_parser.add_argument("--template",           required=True)
     arg_parser.add_argument("--output-dir",         required=True)
@@ -401,19 +539,31 @@ def main():
         print(f"Error: questt-dir not found: {questt_dir}", file=sys.stderr); sys.exit(1)
 
     output_dir.mkdir(parents=True, exist_ok=True)
-    txt_files = sorted(questt_dir.glob("*.txt"))
+    # Read and split once, shared by every quiz
+    template = compile_template(template_path.read_bytes())
+    if "QUESTIONS_JSON" not in template[1]:
+        print("Warning: template has no {{QUESTIONS_JSON}} placeholder — quizzes will have no questions",
+              file=sys.stderr)
+    txt_files = list_txt_files(questt_dir)
 
     if not txt_files and args.mode != "pages":
         print(f"No .txt files found in {questt_dir}", file=sys.stderr); sys.exit(1)
 
     all_generated, all_skipped = [], []
 
+    # Parse every subject file once; individual and cluster quizzes share the results
+    parsed = parse_files(txt_files) if args.mode != "pages" else {}
+    # Encode each usable subject once; cluster quizzes splice these fragments together
+    encoded = {p: encode_questions(r["questions"]) for p, r in parsed.items()
+               if r["success"] and r["question_count"] > 0}
+
     if args.mode in ("individual", "all"):
-        g, s = run_individual(args, txt_files, template_path, output_dir)
+        g, s = run_individual(args, parsed, encoded, template, output_dir)
         all_generated.extend(g); all_skipped.extend(s)
 
     if args.mode in ("clusters", "all"):
-        g, s = run_clusters(args, txt_files, template_path, output_dir)
+        g, s = run_clusters(args, index_subject_files(txt_files), parsed, encoded,
+                            template, output_dir)
         all_generated.extend(g); all_skipped.extend(s)
 
     if args.mode in ("pages", "all"):
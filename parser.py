@@ -9,10 +9,20 @@ special characters natively. Escaping would cause &lt; to appear literally.
 """
 
 import re
+import io
 import json
+import os
 import sys
+from collections import Counter
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# orjson is optional — used for the JSON the scripts write, with a stdlib fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 SUBJECT_KEYWORDS = {
     'physics':     ['physics', 'phy'],
@@ -28,27 +38,80 @@ SUBJECT_KEYWORDS = {
     'economics':   ['economics', 'econ', 'eco'],
 }
 
+# Below this much input, starting worker processes costs more than it saves:
+# parsing runs at ~30 MB/s in-process and a pool takes tens of ms to start
+PARALLEL_MIN_BYTES = 2_000_000
+
+# Compact stdlib encoder for encode_questions when orjson is unavailable
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False).encode
+
+
+class Question(NamedTuple):
+    """One parsed question. Field names are the JSON keys the quiz page expects;
+    parse_file converts to plain dicts only when building its result."""
+    id:      int
+    text:    str
+    optionA: str
+    optionB: str
+    optionC: str
+    optionD: str
+    answer:  str
+
+
+# One alternation over every keyword, longest first so 'mathematics' wins over 'math'
+_KEYWORD_SUBJECT = {kw: subject.capitalize() for subject, kws in SUBJECT_KEYWORDS.items() for kw in kws}
+_SUBJECT_RE = re.compile('|'.join(map(re.escape, sorted(_KEYWORD_SUBJECT, key=len, reverse=True))))
+
+# Compiled once — parse_question_block runs for every block of every file
+_BLOCK_SPLIT_RE = re.compile(r'\n\s*\n+')
+# Fast path: the usual block layout — question line, A-D in order, then the
+# answer line — in one match. Anything else falls back to _TOKEN_RE.
+_QUESTION_RE = re.compile(
+    r'(\d+)\.[^\S\n]*(.*\S)[^\S\n]*\n'
+    r'[^\S\n]*A\.[^\S\n]*(.*\S)[^\S\n]*\n'
+    r'[^\S\n]*B\.[^\S\n]*(.*\S)[^\S\n]*\n'
+    r'[^\S\n]*C\.[^\S\n]*(.*\S)[^\S\n]*\n'
+    r'[^\S\n]*D\.[^\S\n]*(.*\S)[^\S\n]*\n'
+    r'[^\S\n]*Answer:[^\S\n]*([A-D])[^\S\n]*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# One line-anchored pass per block. Groups: 1-2 question number/text,
+# 3-4 option letter/text, 5 answer letter. Values exclude surrounding blanks.
+_TOKEN_RE = re.compile(
+    r'^[^\S\n]*(?:(\d+)\.[^\S\n]*(.*\S)'
+    r'|([A-D])\.[^\S\n]*(.*\S)'
+    r'|Answer:[^\S\n]*([A-D]))[^\S\n]*$',
+    re.IGNORECASE | re.MULTILINE,
+)
+
 
 def detect_subject(filename: str) -> Optional[str]:
-    filename_lower = filename.lower()
-    for subject, keywords in SUBJECT_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in filename_lower:
-                return subject.capitalize()
-    return None
+    # The earliest keyword in the name decides, e.g. Literature_in_English -> Literature
+    m = _SUBJECT_RE.search(filename.lower())
+    return _KEYWORD_SUBJECT[m.group(0)] if m else None
+
+
+def parse_question_file(file_path: Path) -> Tuple[List[Question], str, List[str]]:
+    return _parse_question_file(file_path, detect_subject(file_path.name))
 
 
-def parse_question_file(file_path: Path) -> Tuple[List[Dict], str, List[str]]:
+def _parse_question_file(file_path: Path, subject: Optional[str]) -> Tuple[List[Question], str, List[str]]:
     questions = []
     errors = []
 
-    subject = detect_subject(file_path.name)
     if not subject:
         errors.append(f"Could not detect subject from filename: {file_path.name}")
         subject = file_path.stem.replace('_', ' ').replace('-', ' ').title()
 
     try:
-        content = file_path.read_text(encoding='utf-8')
+        data = file_path.read_bytes()   # one whole-file read
+        # Same newline handling as a text-mode read: \r\n and lone \r become \n.
+        # Done on the bytes (0x0D never occurs inside a UTF-8 sequence) so the
+        # decoded text is never copied again.
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        content = data.decode('utf-8')
     except UnicodeDecodeError:
         errors.append(f"File encoding error — not UTF-8: {file_path.name}")
         return [], subject, errors
@@ -56,8 +119,7 @@ def parse_question_file(file_path: Path) -> Tuple[List[Dict], str, List[str]]:
         errors.append(f"Failed to read file: {e}")
         return [], subject, errors
 
-    content = content.replace('\r\n', '\n')
-    question_blocks = re.split(r'\n\s*\n+', content.strip())
+    question_blocks = _BLOCK_SPLIT_RE.split(content.strip())
 
     for block_idx, block in enumerate(question_blocks):
         block = block.strip()
@@ -75,79 +137,60 @@ def parse_question_file(file_path: Path) -> Tuple[List[Dict], str, List[str]]:
     return questions, subject, errors
 
 
-def parse_question_block(block: str, expected_num: int) -> Optional[Dict]:
-    lines = [line.strip() for line in block.split('\n') if line.strip()]
+def parse_question_block(block: str, expected_num: int) -> Optional[Question]:
+    m = _QUESTION_RE.match(block)
+    # Trailing lines (e.g. an explanation) are fine unless one is another option
+    # line, which would override — leave that to the general path below
+    if m and not any(t.group(3) for t in _TOKEN_RE.finditer(block, m.end())):
+        num, text, a, b, c, d, ans = m.groups()
+        return Question(int(num), text, a, b, c, d, ans.upper())
 
-    if len(lines) < 6:
+    # block is stripped, so its first line must be the numbered question line
+    tokens = _TOKEN_RE.finditer(block)
+    first = next(tokens, None)
+    if first is None or first.start() != 0 or first.group(1) is None:
         return None
 
-    question_match = re.match(r'^(\d+)\.\s*(.+)$', lines[0])
-    if not question_match:
-        return None
-
-    question_num  = int(question_match.group(1))
-    question_text = question_match.group(2).strip()
+    num, question_text = first.group(1, 2)
+    question_num = int(num)
 
     options = {}
-    option_pattern = re.compile(r'^([A-D])\.\s*(.+)$', re.IGNORECASE)
-
-    for line in lines[1:]:
-        m = option_pattern.match(line)
-        if m:
-            options[m.group(1).upper()] = m.group(2).strip()
-
-    if len(options) != 4 or not all(o in options for o in 'ABCD'):
-        return None
-
     answer = None
-    answer_pattern = re.compile(r'^Answer:\s*([A-D])$', re.IGNORECASE)
-    for line in lines:
-        m = answer_pattern.match(line)
-        if m:
-            answer = m.group(1).upper()
-            break
-
-    if not answer:
+    for m in tokens:
+        _, _, label, value, ans = m.groups()
+        if label:
+            options[label.upper()] = value   # a repeated letter: last one wins
+        elif ans and answer is None:
+            answer = ans.upper()             # first Answer: line wins
+
+    # question line + four options + answer always span at least six lines
+    if len(options) != 4 or not answer:
         return None
 
-    return {
-        'id':      question_num,
-        'text':    question_text,
-        'optionA': options['A'],
-        'optionB': options['B'],
-        'optionC': options['C'],
-        'optionD': options['D'],
-        'answer':  answer,
-    }
+    return Question(question_num, question_text,
+                    options['A'], options['B'], options['C'], options['D'], answer)
 
 
-def validate_questions(questions: List[Dict], expected_count: int = 35) -> List[str]:
+def validate_questions(questions: List[Question], expected_count: int = 35) -> List[str]:
     errors = []
 
     if len(questions) != expected_count:
         errors.append(f"Expected {expected_count} questions, got {len(questions)}")
 
-    ids = [q['id'] for q in questions]
-    if len(ids) != len(set(ids)):
-        dupes = {i for i in ids if ids.count(i) > 1}
+    ids = [q.id for q in questions]
+    counts = Counter(ids)
+    dupes = {i for i, c in counts.items() if c > 1}
+    if dupes:
         errors.append(f"Duplicate question IDs: {dupes}")
 
-    expected_ids = list(range(1, len(questions) + 1))
-    if sorted(ids) != expected_ids:
-        missing = set(expected_ids) - set(ids)
+    # n distinct ids spanning exactly 1..n cannot have gaps — skip the set diff
+    if dupes or (ids and (min(ids) != 1 or max(ids) != len(ids))):
+        missing = set(range(1, len(ids) + 1)).difference(counts)
         if missing:
             errors.append(f"Missing question numbers: {sorted(missing)}")
 
-    for q in questions:
-        qid = q['id']
-        if not q['text']:
-            errors.append(f"Q{qid}: Empty question text")
-        for opt in 'ABCD':
-            if not q.get(f'option{opt}'):
-                errors.append(f"Q{qid}: Empty option {opt}")
-        if q['answer'] not in 'ABCD':
-            errors.append(f"Q{qid}: Invalid answer '{q['answer']}'")
-
+    # No per-question field checks: parse_question_block only returns questions
+    # with non-empty text and options and an answer in A-D.
     return errors
 
 
@@ -158,22 +201,85 @@ def parse_file(file_path: str) -> Dict:
         return {'success': False, 'subject': None, 'questions': [], 'question_count': 0,
                 'errors': [f"File not found: {file_path}"], 'filename': path.name}
 
-    questions, subject, parse_errors = parse_question_file(path)
+    return _build_result(*parse_question_file(path), path.name)
+
+
+def parse_path(path: Path, subject: Optional[str]) -> Dict:
+    """Like parse_file, for a path the caller has already checked and whose subject
+    it has already run through detect_subject (None if detection failed)."""
+    return _build_result(*_parse_question_file(path, subject), path.name)
+
+
+def _build_result(questions: List[Question], subject: str, parse_errors: List[str], filename: str) -> Dict:
     validation_errors = validate_questions(questions) if questions else []
     all_errors = parse_errors + validation_errors
 
     return {
         'success':        len(all_errors) == 0,
         'subject':        subject,
-        'questions':      questions,   # raw — no HTML escaping
+        'questions':      [q._asdict() for q in questions],   # raw — no HTML escaping
         'question_count': len(questions),
         'errors':         all_errors,
-        'filename':       path.name,
+        'filename':       filename,
     }
 
 
+def list_txt_files(folder: Path) -> List[os.DirEntry]:
+    """.txt entries in folder, sorted by name. The DirEntry objects are kept as-is:
+    .name and .path are already strings, so no Path is built per file."""
+    with os.scandir(folder) as it:
+        return sorted((e for e in it if e.name.endswith(".txt") and e.is_file()), key=attrgetter("name"))
+
+
+def total_size(paths: Iterable[str]) -> int:
+    """Combined size in bytes of paths; unreadable ones count as 0 (the parser
+    reports those itself)."""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def parallel_map(fn: Callable, total_bytes: int, *iterables: list) -> list:
+    """map(fn, *iterables) as a list, in order. Worker processes are used only
+    for at least PARALLEL_MIN_BYTES of input on a machine with several cores;
+    if the pool cannot start or breaks, everything runs in-process instead."""
+    workers = min(len(iterables[0]), os.cpu_count() or 1)
+    if workers > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+        # Imported here: multiprocessing alone costs more to import than
+        # parsing every shipped file, and most runs never get this far
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                return list(ex.map(fn, *iterables))
+        except (OSError, BrokenProcessPool):
+            pass  # e.g. worker processes are not allowed here
+    return list(map(fn, *iterables))
+
+
 def batch_parse(file_paths: List[str]) -> Dict[str, Dict]:
-    return {Path(fp).name: parse_file(fp) for fp in file_paths}
+    # Each file parses independently and parsing is CPU-bound — large batches use all cores
+    results = parallel_map(parse_file, total_size(file_paths), file_paths)
+    return {Path(fp).name: r for fp, r in zip(file_paths, results)}
+
+
+def encode_questions(questions: List[Dict]) -> bytes:
+    """Compact UTF-8 JSON for a list of questions."""
+    return orjson.dumps(questions) if orjson else _encode_json(questions).encode('utf-8')
+
+
+def _dump_json(obj, path: str) -> None:
+    """Write obj as indented UTF-8 JSON in a single write."""
+    if orjson:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
 
 
 if __name__ == '__main__':
@@ -197,9 +303,10 @@ if __name__ == '__main__':
     else:
         results = batch_parse(file_paths)
         successful = sum(1 for r in results.values() if r['success'])
+        log = io.StringIO()  # one stdout write instead of one per file
         for filename, result in results.items():
             status = "✅" if result['success'] else "❌"
-            print(f"{status} {filename} — {result['subject']} ({result['question_count']} Q)")
-        print(f"\nSummary: {successful}/{len(results)} files OK")
-        with open("batch_parse_results.json", 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+            print(f"{status} {filename} — {result['subject']} ({result['question_count']} Q)", file=log)
+        print(f"\nSummary: {successful}/{len(results)} files OK", file=log)
+        sys.stdout.write(log.getvalue())
+        _dump_json(results, "batch_parse_results.json")
@@ -5,15 +5,23 @@ Validates .txt question files before processing
 Generates validation reports for archiving
 """
 
+import io
 import json
+import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# orjson is optional — faster report serialization, emits UTF-8 bytes directly
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import parser functions
 try:
-    from parser import parse_file, detect_subject
+    from parser import parse_path, detect_subject, parallel_map
 except ImportError:
     print("Error: parser.py must be in the same directory")
     sys.exit(1)
@@ -28,12 +36,14 @@ class QuestionValidator:
         self.invalid_files = []
         self.warnings = []
     
-    def validate_file(self, file_path: Path) -> Dict:
+    def validate_file(self, file_path: Path, file_size: Optional[int] = None) -> Dict:
         """
         Validate a single question file.
         
         Args:
             file_path: Path to question file
+            file_size: Size in bytes if the caller already has it (e.g. from
+                os.scandir) — skips the existence check and stat
         
         Returns:
             Validation result dictionary
@@ -49,12 +59,13 @@ class QuestionValidator:
         }
         
         # Check file exists
-        if not file_path.exists():
-            result['errors'].append("File does not exist")
-            return result
+        if file_size is None:
+            if not file_path.exists():
+                result['errors'].append("File does not exist")
+                return result
+            file_size = file_path.stat().st_size
         
         # Check file size (not empty, not too large)
-        file_size = file_path.stat().st_size
         if file_size == 0:
             result['errors'].append("File is empty")
             return result
@@ -70,7 +81,8 @@ class QuestionValidator:
             result['warnings'].append(f"Unexpected file extension: {file_path.suffix} (expected .txt)")
         
         # Detect subject
-        subject = detect_subject(file_path.name)
+        detected = detect_subject(file_path.name)
+        subject = detected
         if not subject:
             result['warnings'].append("Could not detect subject from filename")
             # Use filename as fallback
@@ -78,8 +90,8 @@ class QuestionValidator:
         
         result['subject'] = subject
         
-        # Parse the file
-        parse_result = parse_file(str(file_path))
+        # Parse the file — existence and subject are already settled above
+        parse_result = parse_path(file_path, detected)
         
         if not parse_result['success']:
             result['errors'].extend(parse_result['errors'])
@@ -107,14 +119,6 @@ class QuestionValidator:
         if duplicates:
             result['warnings'].append(f"Possible duplicate questions at positions: {duplicates}")
         
-        # Check for HTML-unsafe characters (should be escaped by parser)
-        unsafe_chars_found = False
-        for q in questions:
-            for field in ['text', 'optionA', 'optionB', 'optionC', 'optionD']:
-                if any(char in q[field] for char in ['<', '>', '&amp;', '&lt;', '&gt;']):
-                    # Parser should have escaped these already
-                    pass
-        
         # Store metadata
         result['metadata']['question_count'] = len(questions)
         result['metadata']['subject'] = subject
@@ -141,8 +145,11 @@ class QuestionValidator:
                 'error': f"Directory does not exist: {directory}"
             }
         
-        # Find all .txt files
-        txt_files = list(directory.glob('*.txt'))
+        # Find all .txt files — one scandir pass, one stat per file for its size
+        with os.scandir(directory) as it:
+            entries = [e for e in it if e.name.endswith('.txt') and e.is_file()]
+        txt_files = [directory / e.name for e in entries]
+        sizes = [e.stat().st_size for e in entries]
         
         if not txt_files:
             return {
@@ -150,9 +157,11 @@ class QuestionValidator:
                 'error': f"No .txt files found in: {directory}"
             }
         
-        # Validate each file
-        for txt_file in txt_files:
-            result = self.validate_file(txt_file)
+        # Validate each file — independent and CPU-bound, so large batches
+        # are spread across cores (falls back to in-process if they can't be)
+        results = parallel_map(_validate_file, sum(sizes), txt_files, sizes)
+
+        for txt_file, result in zip(txt_files, results):
             self.validation_results[txt_file.name] = result
             
             if result['valid']:
@@ -188,67 +197,93 @@ class QuestionValidator:
             'warnings': self.warnings
         }
     
-    def save_report(self, output_path: Path):
+    def save_report(self, output_path: Path, pretty: bool = False):
         """
         Save validation report to JSON file.
         
+        The report is encoded in full, written to a temporary file next to
+        output_path in one write, then renamed over it — readers never see
+        a partially written report.
+        
         Args:
             output_path: Path to output JSON file
+            pretty: Indent the JSON (compact by default)
         """
         report = self.generate_report()
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2)
+        if orjson:
+            data = orjson.dumps(report, option=orjson.OPT_INDENT_2 if pretty else 0)
+        elif pretty:
+            data = json.dumps(report, indent=2, ensure_ascii=False).encode('utf-8')
+        else:
+            data = json.dumps(report, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        
+        tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
         
         return output_path
     
     def print_summary(self):
         """Print validation summary to console"""
         report = self.generate_report()
-        
-        print(f"\n{'='*60}")
-        print("VALIDATION SUMMARY")
-        print(f"{'='*60}")
-        print(f"Timestamp: {report['timestamp']}")
-        print(f"Total Files: {report['summary']['total_files']}")
-        print(f"Valid Files: {report['summary']['valid_files']} ✅")
-        print(f"Invalid Files: {report['summary']['invalid_files']} ❌")
-        print(f"Status: {report['summary']['validation_status']}")
-        print(f"{'='*60}\n")
+        out = io.StringIO()  # build the whole summary, then one stdout write
+        
+        print(f"\n{'='*60}", file=out)
+        print("VALIDATION SUMMARY", file=out)
+        print(f"{'='*60}", file=out)
+        print(f"Timestamp: {report['timestamp']}", file=out)
+        print(f"Total Files: {report['summary']['total_files']}", file=out)
+        print(f"Valid Files: {report['summary']['valid_files']} ✅", file=out)
+        print(f"Invalid Files: {report['summary']['invalid_files']} ❌", file=out)
+        print(f"Status: {report['summary']['validation_status']}", file=out)
+        print(f"{'='*60}\n", file=out)
         
         # Valid files
         if self.valid_files:
-            print("✅ VALID FILES:")
+            print("✅ VALID FILES:", file=out)
             for filename in self.valid_files:
                 result = self.validation_results[filename]
-                print(f"   • {filename}")
-                print(f"     Subject: {result['subject']}")
-                print(f"     Questions: {result['metadata']['question_count']}")
+                print(f"   • {filename}", file=out)
+                print(f"     Subject: {result['subject']}", file=out)
+                print(f"     Questions: {result['metadata']['question_count']}", file=out)
                 if result['warnings']:
-                    print(f"     Warnings: {len(result['warnings'])}")
-            print()
+                    print(f"     Warnings: {len(result['warnings'])}", file=out)
+            print(file=out)
         
         # Invalid files
         if self.invalid_files:
-            print("❌ INVALID FILES:")
+            print("❌ INVALID FILES:", file=out)
             for filename in self.invalid_files:
                 result = self.validation_results[filename]
-                print(f"   • {filename}")
+                print(f"   • {filename}", file=out)
                 if result['subject']:
-                    print(f"     Subject: {result['subject']}")
-                print(f"     Errors: {len(result['errors'])}")
+                    print(f"     Subject: {result['subject']}", file=out)
+                print(f"     Errors: {len(result['errors'])}", file=out)
                 for error in result['errors'][:3]:
-                    print(f"       - {error}")
+                    print(f"       - {error}", file=out)
                 if len(result['errors']) > 3:
-                    print(f"       ... and {len(result['errors']) - 3} more")
-            print()
+                    print(f"       ... and {len(result['errors']) - 3} more", file=out)
+            print(file=out)
         
         # Overall warnings
         if self.warnings:
-            print("⚠️  GLOBAL WARNINGS:")
+            print("⚠️  GLOBAL WARNINGS:", file=out)
             for warning in self.warnings:
-                print(f"   • {warning}")
-            print()
+                print(f"   • {warning}", file=out)
+            print(file=out)
+        
+        sys.stdout.write(out.getvalue())
+
+
+def _validate_file(file_path: Path, file_size: int) -> Dict:
+    """Process-pool entry point — a bound method would pickle the whole validator."""
+    return QuestionValidator().validate_file(file_path, file_size)
 
 
 def validate_cluster_requirements(validation_results: Dict) -> Dict:
@@ -296,15 +331,18 @@ def validate_cluster_requirements(validation_results: Dict) -> Dict:
 
 def main():
     """Main validation function"""
-    if len(sys.argv) < 2:
-        print("Usage: python validate_questions.py <directory_path> [output_report.json]")
+    pretty = '--pretty' in sys.argv
+    args = [a for a in sys.argv[1:] if a != '--pretty']
+    
+    if len(args) < 1:
+        print("Usage: python validate_questions.py <directory_path> [output_report.json] [--pretty]")
         print("\nExample:")
         print("  python validate_questions.py ./questions")
-        print("  python validate_questions.py ./questions validation-report.json")
+        print("  python validate_questions.py ./questions validation-report.json --pretty")
         sys.exit(1)
     
-    directory_path = Path(sys.argv[1])
-    output_file = Path(sys.argv[2]) if len(sys.argv) > 2 else Path('validation-report.json')
+    directory_path = Path(args[0])
+    output_file = Path(args[1]) if len(args) > 1 else Path('validation-report.json')
     
     # Initialize validator
     validator = QuestionValidator()
@@ -335,7 +373,7 @@ def main():
     print()
     
     # Save report
-    saved_path = validator.save_report(output_file)
+    saved_path = validator.save_report(output_file, pretty)
     print(f"{'='*60}")
     print(f"Report saved to: {saved_path}")
     print(f"{'='*60}\n")
@@ -13,36 +13,135 @@ Usage (from yml):
     VALID_COUNT: ${{ steps.validate.outputs.valid_files }}
     TOTAL_COUNT: ${{ steps.validate.outputs.total_files }}
   run: python main-repo/write_metadata.py
+
+Batch mode: set BATCH_SPEC to a JSON list of objects using the same variable
+names, e.g. '[{"PERIOD": 3, "DAY_RANGE": "5-6"}, {"PERIOD": 4, "DAY_RANGE": "7-8"}]'.
+Each object must set its own DAY_RANGE and is layered over the environment, so
+shared values (GEN_DATE, ...) can stay in env; values are strings or integers, and
+null leaves a variable to the environment. All files are written by one process.
 """
 
 import json
 import os
 import sys
+from collections.abc import Mapping
 
-def main():
-    day_range = os.environ.get("DAY_RANGE", "")
-    if not day_range:
-        print("ERROR: DAY_RANGE env var not set", file=sys.stderr)
-        sys.exit(1)
-
-    data = {
-        "period":            int(os.environ.get("PERIOD", 1)),
-        "day_range":         day_range,
-        "generated_date":    os.environ.get("GEN_DATE", ""),
-        "validation_status": os.environ.get("VALIDATION_STATUS", "UNKNOWN"),
-        "total_files":       int(os.environ.get("TOTAL_COUNT", 0)),
-        "valid_files":       int(os.environ.get("VALID_COUNT", 0)),
+# orjson is optional — the stdlib fallback writes the same document
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _int_env(env: Mapping[str, str], name: str, default: int) -> int:
+    """int() of env[name]; unset or blank gives default without parsing anything."""
+    value = env.get(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)   # int() itself tolerates surrounding whitespace
+
+def build_metadata(env: Mapping[str, str]) -> dict:
+    """Metadata record from an environment mapping (os.environ in normal use)."""
+    return {
+        "period":            _int_env(env, "PERIOD", 1),
+        "day_range":         env.get("DAY_RANGE", ""),
+        "generated_date":    env.get("GEN_DATE", ""),
+        "validation_status": env.get("VALIDATION_STATUS", "UNKNOWN"),
+        "total_files":       _int_env(env, "TOTAL_COUNT", 0),
+        "valid_files":       _int_env(env, "VALID_COUNT", 0),
     }
 
-    out_path = os.path.join(
-        "archive-repo", "archive", f"day-{day_range}", "metadata.json"
-    )
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+def _write_one(data: dict) -> None:
+    day_range = data["day_range"]
+    parent = os.path.join("archive-repo", "archive", f"day-{day_range}")
+    out_path = os.path.join(parent, "metadata.json")
+    # archive-repo/archive normally exists already — one mkdir, full makedirs only if not
+    try:
+        os.mkdir(parent)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(parent, exist_ok=True)
+
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        payload = (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    # Whole document written to a temp file beside the target, fsync'd and then
+    # renamed over it — readers see the old file or the new one, never a torn one
+    tmp_path = os.path.join(parent, f".metadata.json.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            # One write() in practice; loop in case the kernel takes only part of it
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
 
     print(f"metadata.json written to {out_path}")
 
+def _spec_error(message: str) -> None:
+    print(f"ERROR: BATCH_SPEC {message}", file=sys.stderr)
+    sys.exit(1)
+
+def _batch_records(env: Mapping[str, str], batch_spec: str) -> list:
+    """One record per BATCH_SPEC entry, layered over env. Exits 1 on a bad spec."""
+    try:
+        items = json.loads(batch_spec)
+    except ValueError as e:
+        _spec_error(f"is not valid JSON: {e}")
+    if not isinstance(items, list) or not items:
+        _spec_error("must be a non-empty JSON list of objects")
+    records, seen = [], set()
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            _spec_error(f"entry {i} is not an object: {item!r}")
+        # Values stand in for env vars, so only strings and integers make sense;
+        # null means "not set" and leaves the environment's value (or the default)
+        for k, v in item.items():
+            if v is not None and (isinstance(v, bool) or not isinstance(v, (str, int))):
+                _spec_error(f"entry {i}: {k} must be a string or an integer, got {v!r}")
+        record = {**env, **{k: str(v) for k, v in item.items() if v is not None}}
+        # Each entry names its own DAY_RANGE — inheriting env's would make
+        # several entries overwrite the same metadata.json
+        day_range = str(item.get("DAY_RANGE") or "")
+        if not day_range:
+            _spec_error(f"entry {i} has no DAY_RANGE: {item!r}")
+        if day_range in seen:
+            _spec_error(f"entry {i} repeats DAY_RANGE {day_range}")
+        seen.add(day_range)
+        for name in ("PERIOD", "TOTAL_COUNT", "VALID_COUNT"):
+            try:
+                _int_env(record, name, 0)
+            except ValueError:
+                _spec_error(f"entry {i}: {name} is not an integer: {record[name]!r}")
+        records.append(record)
+    return records
+
+def main():
+    env = os.environ
+    batch_spec = env.get("BATCH_SPEC")
+    if batch_spec:
+        # Checked in full before anything is written, so a bad batch writes nothing
+        records = _batch_records(env, batch_spec)
+    else:
+        if not env.get("DAY_RANGE"):
+            print("ERROR: DAY_RANGE env var not set", file=sys.stderr)
+            sys.exit(1)
+        records = [env]
+
+    for data in [build_metadata(r) for r in records]:
+        _write_one(data)
+
 if __name__ == "__main__":
     main()